@@ -0,0 +1,62 @@
+import asyncio
+import json
+from threading import Lock
+
+# Events buffered per client before it is considered too slow
+CLIENT_QUEUE_SIZE = 100
+RESYNC_EVENT = "resync"
+_lock = Lock()
+_subscribers = set()
+_last_event_id = 0
+
+class Subscriber:
+    """One connected client: a bounded queue owned by the event loop serving it"""
+
+    def __init__(self, loop, maxsize=CLIENT_QUEUE_SIZE):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+
+    def offer(self, message):
+        # Runs on the subscriber's loop. A client that falls behind loses its
+        # backlog and is told to refetch, so one slow reader never holds up
+        # publishers or grows memory without bound.
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = dict(resync_message(), id=message["id"])
+        self.queue.put_nowait(message)
+
+def subscribe() -> Subscriber:
+    """Register a subscriber on the running event loop"""
+    subscriber = Subscriber(asyncio.get_running_loop())
+    with _lock:
+        _subscribers.add(subscriber)
+    return subscriber
+
+def unsubscribe(subscriber: Subscriber):
+    with _lock:
+        _subscribers.discard(subscriber)
+
+def publish(event_type: str, data: dict):
+    """Send an event to every subscriber. Safe to call from any thread."""
+    global _last_event_id
+    with _lock:
+        _last_event_id += 1
+        message = {"id": _last_event_id, "type": event_type, "data": data}
+        subscribers = list(_subscribers)
+    for subscriber in subscribers:
+        try:
+            subscriber.loop.call_soon_threadsafe(subscriber.offer, message)
+        except RuntimeError:
+            # The subscriber's loop has closed
+            unsubscribe(subscriber)
+
+def last_event_id() -> int:
+    with _lock:
+        return _last_event_id
+
+def resync_message() -> dict:
+    return {"id": last_event_id(), "type": RESYNC_EVENT, "data": {}}
+
+def format_sse(message: dict) -> str:
+    return f"id: {message['id']}\nevent: {message['type']}\ndata: {json.dumps(message['data'], default=str)}\n\n"
@@ -1,12 +1,20 @@
 import pandas as pd
 import os
+import csv
+import io
 import json
 import re
+import shutil
+import tempfile
 from datetime import datetime
 from threading import RLock
+from openpyxl import Workbook, load_workbook
+import events
 
 MASTER_FILE = "exams_master.xlsx"
 SHEETS_DIR = "exam_sheets"
+RESULT_COLUMNS = ['id', 'exam_id', 'exam_title', 'employee_name', 'score', 'total_questions', 'percentage', 'completed_at', 'feedback']
+EXPORT_CHUNK_ROWS = 500
 _lock = RLock()
 
 def _get_next_id(df):
@@ -81,7 +89,14 @@ def write_exam(title, questions, published=1):
             # Write to the new file
             with pd.ExcelWriter(exam_filename, engine='openpyxl') as writer:
                  df_results.to_excel(writer, sheet_name='ExamResults', index=False)
-                 
+
+            if published == 1:
+                events.publish('exam-published', {
+                    'id': new_id,
+                    'title': title,
+                    'created_at': new_row['created_at'],
+                    'question_count': len(questions)
+                })
             return new_id
         except Exception as e:
             print(f"Error writing exam: {e}")
@@ -103,6 +118,8 @@ def delete_exam(exam_id):
             df = df[df['id'] != exam_id]
             with pd.ExcelWriter(MASTER_FILE, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
                 df.to_excel(writer, sheet_name='Exams', index=False)
+
+            events.publish('exam-deleted', {'id': exam_id})
         except Exception as e:
             print(f"Error deleting exam: {e}")
             raise e
@@ -169,7 +186,8 @@ def write_result(exam_id, exam_title, employee_name, score, total_questions, per
             
             with pd.ExcelWriter(exam_filename, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
                 df.to_excel(writer, sheet_name='ExamResults', index=False)
-                
+
+            events.publish('result-added', {k: v for k, v in new_row.items() if k != 'feedback'})
             return new_id
         except Exception as e:
             print(f"Error writing result: {e}")
@@ -182,3 +200,105 @@ def check_result_exists(exam_id, employee_name):
         if r['employee_name'] == employee_name:
             return True
     return False
+
+def _snapshot_exam_file(filename):
+    """Copy an exam workbook to a temp file so it can be read without holding the lock"""
+    with _lock:
+        if not filename or not os.path.exists(filename):
+            return None
+        fd, snapshot = tempfile.mkstemp(suffix='.xlsx')
+        os.close(fd)
+        shutil.copyfile(filename, snapshot)
+        return snapshot
+
+def _iter_exam_file_rows(filename):
+    """Yield result rows from one exam workbook, one row at a time"""
+    snapshot = _snapshot_exam_file(filename)
+    if snapshot is None:
+        return
+    try:
+        wb = load_workbook(snapshot, read_only=True)
+        try:
+            rows = wb['ExamResults'].iter_rows(values_only=True)
+            header = next(rows, None)
+            if not header:
+                return
+            for values in rows:
+                if all(v is None for v in values):
+                    continue
+                row = dict(zip(header, values))
+                yield [row.get(col) for col in RESULT_COLUMNS]
+        finally:
+            wb.close()
+    finally:
+        os.remove(snapshot)
+
+def iter_results(exam_id=None):
+    """
+    Yield (exam, row) pairs for every stored result without loading whole
+    workbooks into memory. Rows are lists ordered like RESULT_COLUMNS.
+    """
+    for exam in read_exams():
+        if exam_id is not None and exam['id'] != exam_id:
+            continue
+        try:
+            for row in _iter_exam_file_rows(exam.get('filename')):
+                yield exam, row
+        except Exception as ex:
+            print(f"Failed to read results for exam {exam['id']}: {ex}")
+
+def stream_results_csv(exam_id=None):
+    """Yield the consolidated results as CSV text in chunks of EXPORT_CHUNK_ROWS rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(RESULT_COLUMNS)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    for _, row in iter_results(exam_id):
+        writer.writerow(row)
+        pending += 1
+        if pending >= EXPORT_CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+def _export_sheet_title(exam):
+    # Excel limits sheet names to 31 characters
+    return f"Exam_{exam['id']}_{_sanitize_filename(str(exam['title']))}"[:31]
+
+def export_results_xlsx(exam_id=None, per_exam=False):
+    """
+    Write the consolidated results to a temporary workbook using openpyxl's
+    write-only mode and return its path. The caller removes the file.
+    """
+    wb = Workbook(write_only=True)
+    sheets = {}
+
+    def sheet_for(exam):
+        key = exam['id'] if per_exam else None
+        if key not in sheets:
+            title = _export_sheet_title(exam) if per_exam else 'Results'
+            sheets[key] = wb.create_sheet(title=title)
+            sheets[key].append(RESULT_COLUMNS)
+        return sheets[key]
+
+    for exam, row in iter_results(exam_id):
+        sheet_for(exam).append(row)
+
+    if not sheets:
+        wb.create_sheet(title='Results').append(RESULT_COLUMNS)
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        wb.save(path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
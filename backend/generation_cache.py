@@ -0,0 +1,115 @@
+import os
+import json
+import hashlib
+import tempfile
+from datetime import datetime
+from threading import RLock
+
+CACHE_DIR = "generation_cache"
+MAX_CANDIDATES_PER_KEY = 5
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+MAX_CACHE_ENTRIES = 500
+_lock = RLock()
+# Latest (size, mtime, digest) per file path, so there is one entry per material at most
+_digest_memo = {}
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+def file_digest(path):
+    """SHA-256 of a file's contents, memoized per path until its size or mtime changes"""
+    stat = os.stat(path)
+    abs_path = os.path.abspath(path)
+    memo = _digest_memo.get(abs_path)
+    if memo and memo[:2] == (stat.st_size, stat.st_mtime_ns):
+        return memo[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    _digest_memo[abs_path] = (stat.st_size, stat.st_mtime_ns, digest)
+    return digest
+
+def make_key(file_paths, num_questions, model, prompt_version):
+    """Build a content-addressed cache key for a generation request"""
+    payload = json.dumps({
+        "materials": [file_digest(p) for p in file_paths],
+        "num_questions": num_questions,
+        "model": model,
+        "prompt_version": prompt_version,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get_candidates(key):
+    """
+    Return the stored candidates for a key, oldest first, and mark it recently used.
+    Each candidate is a dict with a stable 'id', 'created_at' and 'questions'.
+    """
+    with _lock:
+        path = _entry_path(key)
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except Exception as e:
+            print(f"Error reading generation cache entry {key}: {e}")
+            return []
+        if "next_id" not in entry:
+            # Written before candidates had stable ids
+            return []
+        # mtime doubles as the LRU timestamp
+        os.utime(path, None)
+        return entry.get("candidates", [])
+
+def add_candidate(key, questions):
+    """Store a new question set for a key and return its candidate id"""
+    with _lock:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _entry_path(key)
+        entry = {"next_id": 0, "candidates": []}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                if "next_id" in stored:
+                    entry = stored
+            except Exception as e:
+                print(f"Discarding unreadable generation cache entry {key}: {e}")
+
+        # Ids keep counting up, so an id still names the same set after older ones are trimmed
+        candidate_id = entry["next_id"]
+        entry["next_id"] = candidate_id + 1
+        entry["candidates"].append({
+            "id": candidate_id,
+            "created_at": datetime.utcnow().isoformat(),
+            "questions": questions
+        })
+        entry["candidates"] = entry["candidates"][-MAX_CANDIDATES_PER_KEY:]
+
+        # Write atomically so a crash never leaves a truncated entry behind
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+        _evict()
+        return candidate_id
+
+def _evict():
+    """Drop least recently used entries until the cache fits its size and count limits"""
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        stat = os.stat(path)
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    entries.sort()
+    total_bytes = sum(size for _, size, _ in entries)
+    while entries and (total_bytes > MAX_CACHE_BYTES or len(entries) > MAX_CACHE_ENTRIES):
+        _, size, path = entries.pop(0)
+        os.remove(path)
+        total_bytes -= size
@@ -1,22 +1,35 @@
-from fastapi import FastAPI, UploadFile, File, Body, HTTPException, Depends
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, UploadFile, File, Body, HTTPException, Depends, Request, Query, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import create_engine, Column, Integer, String, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Optional, List
 from datetime import datetime
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
+import asyncio
 import os
 import ollama
-import PyPDF2
 import re
 import json
+import shutil
+import uuid
+import zipfile
 
 # Import Excel Utilities
 from excel_utils import (
     init_excel_db, write_exam, read_exams, get_exam_by_id, delete_exam,
-    write_result, read_results, check_result_exists
+    write_result, read_results, check_result_exists,
+    stream_results_csv, export_results_xlsx
+)
+import generation_cache
+import events
+from materials import (
+    extract_text_from_pdf, ingest_file, get_ingest_pool, reset_ingest_pool,
+    read_pages, warm_pages
 )
 
 # ----------------- Database Setup -----------------
@@ -69,6 +82,8 @@ def get_db():
 class ExamRequest(BaseModel):
     material_ids: List[int]
     num_questions: int = 10
+    regenerate: bool = False
+    candidate: Optional[int] = None
 
 class PublishExamRequest(BaseModel):
     title: str
@@ -84,129 +99,336 @@ class SubmitExamRequest(BaseModel):
 # Employer passcode - change this to your desired passcode
 EMPLOYER_PASSCODE = "admin123"
 
+OLLAMA_MODEL = "llama3:latest"
+# Most pages a single /materials/{id}/pages request may return
+MAX_PAGES_PER_REQUEST = 50
+
+# Longest file name stem and extension (in bytes) kept in generated upload file names
+MAX_UPLOAD_STEM_BYTES = 100
+MAX_UPLOAD_EXT_BYTES = 16
+# Most PDFs, and most uncompressed bytes, extracted from one zip archive in a batch upload
+MAX_ZIP_MEMBERS = 200
+MAX_ZIP_UNCOMPRESSED_BYTES = 500 * 1024 * 1024
+
+# Seconds between SSE keep-alive comments when no events are published
+EVENT_HEARTBEAT_SECONDS = 15
+
+# Bump whenever the MCQ prompt changes so cached question sets are not reused
+MCQ_PROMPT_VERSION = 2
+
 # ----------------- Helper Functions -----------------
-def extract_text_from_pdf(file_path: str) -> str:
-    text = ""
-    with open(file_path, "rb") as f:
-        reader = PyPDF2.PdfReader(f)
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return text
-
-def parse_mcqs_from_text(text: str, num_questions: int = 10) -> List[dict]:
+def _truncate_utf8(text: str, max_bytes: int) -> str:
+    return text.encode("utf-8")[:max_bytes].decode("utf-8", "ignore")
+
+def _upload_name(filename: str, prefix: str = "") -> str:
+    """Unique, length-bounded file name for an upload: prefix, short stem, short uuid, extension"""
+    stem, ext = os.path.splitext(filename)
+    stem = _truncate_utf8(stem, MAX_UPLOAD_STEM_BYTES)
+    ext = _truncate_utf8(ext, MAX_UPLOAD_EXT_BYTES)
+    return f"{prefix}{stem}-{uuid.uuid4().hex[:8]}{ext}"
+
+def _stage_upload(fileobj, filename: str) -> dict:
+    """Stream an upload to a staging file in UPLOAD_FOLDER without reading it into memory"""
+    staged_path = os.path.join(UPLOAD_FOLDER, _upload_name(filename, prefix=".staging-"))
+    try:
+        with open(staged_path, "wb") as out:
+            shutil.copyfileobj(fileobj, out, 1024 * 1024)
+    except Exception:
+        if os.path.exists(staged_path):
+            os.remove(staged_path)
+        raise
+    return {"filename": filename, "staged_path": staged_path}
+
+def _stage_batch(files: List[UploadFile]) -> tuple:
+    """Stage every uploaded file, expanding zip archives into their PDF members"""
+    staged, skipped = [], []
+    try:
+        _stage_files(files, staged, skipped)
+    except Exception:
+        for item in staged:
+            if os.path.exists(item["staged_path"]):
+                os.remove(item["staged_path"])
+        raise
+    return staged, skipped
+
+def _stage_files(files: List[UploadFile], staged: list, skipped: list):
+    for upload in files:
+        name = os.path.basename(upload.filename or "")
+        if not name:
+            continue
+        if name.lower().endswith(".zip"):
+            try:
+                with zipfile.ZipFile(upload.file) as archive:
+                    # Checked against the sizes declared in the archive before anything
+                    # is decompressed; extraction never yields more than the declared size
+                    member_count = 0
+                    uncompressed_bytes = 0
+                    for member in archive.infolist():
+                        member_name = os.path.basename(member.filename)
+                        if member.is_dir() or not member_name or member.filename.startswith("__MACOSX/"):
+                            continue
+                        if not member_name.lower().endswith(".pdf"):
+                            skipped.append({"filename": member_name, "status": "failed", "error": "Not a PDF file"})
+                            continue
+                        if member_count >= MAX_ZIP_MEMBERS:
+                            skipped.append({"filename": member_name, "status": "failed", "error": f"Zip archive has more than {MAX_ZIP_MEMBERS} PDF files"})
+                            continue
+                        if uncompressed_bytes + member.file_size > MAX_ZIP_UNCOMPRESSED_BYTES:
+                            skipped.append({"filename": member_name, "status": "failed", "error": "Zip archive is too large once uncompressed"})
+                            continue
+                        member_count += 1
+                        uncompressed_bytes += member.file_size
+                        try:
+                            with archive.open(member) as src:
+                                staged.append(_stage_upload(src, member_name))
+                        except (OSError, zipfile.BadZipFile) as e:
+                            skipped.append({"filename": member_name, "status": "failed", "error": f"Failed to store file: {str(e)}"})
+            except zipfile.BadZipFile:
+                skipped.append({"filename": name, "status": "failed", "error": "Invalid zip archive"})
+        else:
+            try:
+                staged.append(_stage_upload(upload.file, name))
+            except OSError as e:
+                skipped.append({"filename": name, "status": "failed", "error": f"Failed to store file: {str(e)}"})
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header (comma-separated, may use W/ or *) against an ETag"""
+    if not if_none_match:
+        return False
+    def opaque(tag):
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    candidates = [opaque(tag) for tag in if_none_match.split(",")]
+    return "*" in candidates or opaque(etag) in candidates
+
+def _stored_upload_path(filename: str) -> str:
+    """Unique path in UPLOAD_FOLDER for a batch file, so same-named files never overwrite each other"""
+    return os.path.join(UPLOAD_FOLDER, _upload_name(filename))
+
+# Line-format patterns, compiled once instead of on every line
+QUESTION_PATTERN = re.compile(r"^(?:Question\s*\d*[:.\)]|Q\d*[:.\)]|\d+[:.\)])\s*(.+)", re.IGNORECASE)
+OPTION_PATTERN = re.compile(r"^([A-D])[).]\s*(.+)")
+ANSWER_PATTERN = re.compile(r"^(?:Answer|Correct Answer|Ans)[:.\)]\s*(.+)", re.IGNORECASE)
+
+OPTION_LETTERS = ["A", "B", "C", "D"]
+MCQ_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "questions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "question": {"type": "string"},
+                    "options": {
+                        "type": "object",
+                        "properties": {letter: {"type": "string"} for letter in OPTION_LETTERS},
+                        "required": OPTION_LETTERS
+                    },
+                    "answer": {"type": "string", "enum": OPTION_LETTERS}
+                },
+                "required": ["question", "options", "answer"]
+            }
+        }
+    },
+    "required": ["questions"]
+}
+# How many targeted follow-up calls to make for questions that failed validation
+MAX_FOLLOWUP_ATTEMPTS = 2
+
+def _parse_mcq_lines(text: str) -> List[dict]:
     """
-    Parse MCQs from text with improved pattern matching
+    Parse the line-based 'Question 1: / A) / Answer: A' format.
+    Results go through the same checks as JSON output, so only valid MCQs are kept.
     """
     mcqs = []
     current_q = {}
-    lines = text.splitlines()
-    
-    for line in lines:
+
+    for line in text.splitlines():
         line = line.strip()
         if not line:
             continue
-            
-        # Detect question - More flexible pattern
-        question_match = re.match(r"^(?:Question\s*\d*[:.\)]|Q\d*[:.\)]|\d+[:.\)])\s*(.+)", line, re.IGNORECASE)
+
+        question_match = QUESTION_PATTERN.match(line)
         if question_match:
             # Save previous question if exists
             if current_q and "question" in current_q:
                 mcqs.append(current_q)
             current_q = {"question": question_match.group(1).strip(), "options": {}, "answer": ""}
-            
+            continue
+
         # Detect options - Support both A) and A.
-        elif re.match(r"^[A-D][).]\s*", line):
-            opt_match = re.match(r"^([A-D])[).]\s*(.+)", line)
-            if opt_match and current_q:
-                opt_letter = opt_match.group(1)
-                opt_text = opt_match.group(2).strip()
-                current_q["options"][opt_letter] = opt_text
-                
-        # Detect answer - More flexible pattern
-        elif re.match(r"^(?:Answer|Correct Answer|Ans)[:.\)]\s*", line, re.IGNORECASE):
-            ans_match = re.match(r"^(?:Answer|Correct Answer|Ans)[:.\)]\s*(.+)", line, re.IGNORECASE)
-            if ans_match and current_q:
-                answer_text = ans_match.group(1).strip()
-                # Extract just the letter if it's in format "A)" or "A"
-                answer_letter = answer_text[0].upper() if answer_text else ""
-                current_q["answer"] = answer_letter
-    
+        opt_match = OPTION_PATTERN.match(line)
+        if opt_match:
+            if current_q:
+                current_q["options"][opt_match.group(1)] = opt_match.group(2).strip()
+            continue
+
+        ans_match = ANSWER_PATTERN.match(line)
+        if ans_match and current_q:
+            answer_text = ans_match.group(1).strip()
+            # Extract just the letter if it's in format "A)" or "A"
+            current_q["answer"] = answer_text[0].upper() if answer_text else ""
+
     # Don't forget the last question
     if current_q and "question" in current_q:
         mcqs.append(current_q)
-    
-    # Validate MCQs
-    valid_mcqs = []
-    for mcq in mcqs:
-        if mcq.get("question") and len(mcq.get("options", {})) >= 2:
-            valid_mcqs.append(mcq)
-    
-    if not valid_mcqs:
-        raise HTTPException(
-            status_code=500, 
-            detail=f"Failed to parse MCQs from model response. First 500 chars: {text[:500]}..."
-        )
-    
-    return valid_mcqs[:num_questions]
+
+    return [mcq for mcq in (_validate_mcq(item) for item in mcqs) if mcq]
+
+def _validate_mcq(item) -> Optional[dict]:
+    """Return a normalized MCQ if it matches MCQ_JSON_SCHEMA closely enough, else None"""
+    if not isinstance(item, dict):
+        return None
+    question = item.get("question")
+    options = item.get("options")
+    answer = item.get("answer")
+    if not isinstance(question, str) or not question.strip() or not isinstance(options, dict):
+        return None
+
+    clean_options = {
+        letter: options[letter].strip()
+        for letter in OPTION_LETTERS
+        if isinstance(options.get(letter), str) and options[letter].strip()
+    }
+    if len(clean_options) < 2:
+        return None
+    answer = answer.strip()[:1].upper() if isinstance(answer, str) else ""
+    if answer not in clean_options:
+        return None
+    return {"question": question.strip(), "options": clean_options, "answer": answer}
+
+def parse_mcqs_from_json(text: str) -> Optional[List[dict]]:
+    """Parse a JSON-mode response. Returns None if the output is not JSON at all."""
+    try:
+        data = json.loads(text)
+    except (ValueError, TypeError):
+        return None
+    items = data.get("questions", []) if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return []
+    return [mcq for mcq in (_validate_mcq(item) for item in items) if mcq]
+
+def _build_mcq_prompt(material_text: str, count: int, existing_questions: List[str]) -> str:
+    prompt = f"""Create exactly {count} multiple-choice questions from the following study material.
+
+Respond with JSON only, in exactly this shape:
+{{"questions": [{{"question": "Question text", "options": {{"A": "Option A", "B": "Option B", "C": "Option C", "D": "Option D"}}, "answer": "A"}}]}}
+
+Every question needs all four options, and "answer" must be one of "A", "B", "C" or "D".
+
+Study material:
+{material_text}
+"""
+    if existing_questions:
+        already = "\n".join(f"- {q}" for q in existing_questions)
+        prompt += f"""
+These questions already exist, do not repeat them:
+{already}
+"""
+    return prompt + f"\nNow create {count} questions as JSON:"
+
+def _request_mcqs(material_text: str, count: int, existing_questions: List[str]) -> List[dict]:
+    """Ask the model for `count` MCQs in JSON mode, falling back to the line parser"""
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant that creates multiple-choice questions. Always follow the exact format requested."},
+        {"role": "user", "content": _build_mcq_prompt(material_text, count, existing_questions)}
+    ]
+    response = ollama.chat(model=OLLAMA_MODEL, messages=messages, format=MCQ_JSON_SCHEMA)
+    text_output = response['message']['content']
+
+    # Debug: Log the raw output
+    print("=" * 50)
+    print("RAW OLLAMA OUTPUT:")
+    print(text_output)
+    print("=" * 50)
+
+    mcqs = parse_mcqs_from_json(text_output)
+    if mcqs is None:
+        mcqs = _parse_mcq_lines(text_output)
+    return mcqs
+
+def generate_mcqs_cached(
+    file_paths: List[str],
+    num_questions: int = 10,
+    regenerate: bool = False,
+    candidate: Optional[int] = None
+) -> dict:
+    """
+    Return MCQs from the generation cache when the same materials were used before,
+    otherwise generate a new set and store it as another candidate for this key.
+    Only complete sets are cached; a short set is returned but not stored.
+    """
+    key = generation_cache.make_key(file_paths, num_questions, OLLAMA_MODEL, MCQ_PROMPT_VERSION)
+    candidates = [] if regenerate else generation_cache.get_candidates(key)
+
+    if candidates:
+        if candidate is None:
+            chosen = candidates[-1]
+        else:
+            chosen = next((c for c in candidates if c["id"] == candidate), None)
+            if chosen is None:
+                raise HTTPException(status_code=404, detail="Cached candidate not found")
+        return {
+            "exam": chosen["questions"],
+            "cached": True,
+            "candidate": chosen["id"],
+            "candidates": [c["id"] for c in candidates]
+        }
+
+    mcqs = generate_mcqs(file_paths, num_questions=num_questions)
+    candidate_id = None
+    if len(mcqs) >= num_questions:
+        candidate_id = generation_cache.add_candidate(key, mcqs)
+    return {
+        "exam": mcqs,
+        "cached": False,
+        "candidate": candidate_id,
+        "candidates": [c["id"] for c in generation_cache.get_candidates(key)]
+    }
 
 def generate_mcqs(file_paths: List[str], num_questions: int = 10) -> List[dict]:
     combined_text = ""
     for path in file_paths:
         extracted = extract_text_from_pdf(path)
         combined_text += extracted + "\n\n"
-    
+
     # Truncate if too long (ollama has context limits)
     if len(combined_text) > 10000:
         combined_text = combined_text[:10000] + "..."
 
-    # More specific prompt with exact format
-    prompt = f"""Create exactly {num_questions} multiple-choice questions from the following study material.
-
-Format each question EXACTLY like this:
-
-Question 1: [Question text here]
-A) [Option A]
-B) [Option B]
-C) [Option C]
-D) [Option D]
-Answer: A
-
-Question 2: [Question text here]
-A) [Option A]
-B) [Option B]
-C) [Option C]
-D) [Option D]
-Answer: B
-
-IMPORTANT: For the Answer line, only write the letter (A, B, C, or D), nothing else.
-
-Study material:
-{combined_text}
-
-Now create {num_questions} questions following the exact format above:"""
+    mcqs = []
+    seen = set()
 
-    messages = [
-        {"role": "system", "content": "You are a helpful assistant that creates multiple-choice questions. Always follow the exact format requested."},
-        {"role": "user", "content": prompt}
-    ]
+    def add_unique(batch):
+        for mcq in batch:
+            if mcq["question"].lower() not in seen:
+                seen.add(mcq["question"].lower())
+                mcqs.append(mcq)
 
     try:
-        response = ollama.chat(model="llama3:latest", messages=messages)
-        text_output = response['message']['content']
-        
-        # Debug: Log the raw output
-        print("=" * 50)
-        print("RAW OLLAMA OUTPUT:")
-        print(text_output)
-        print("=" * 50)
-        
+        add_unique(_request_mcqs(combined_text, num_questions, []))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to call Ollama: {str(e)}")
-    
-    mcqs = parse_mcqs_from_text(text_output, num_questions)
-    return mcqs
+
+    # Only ask for the questions that are still missing instead of regenerating the whole set
+    for _ in range(MAX_FOLLOWUP_ATTEMPTS):
+        missing = num_questions - len(mcqs)
+        if missing <= 0:
+            break
+        print(f"Got {len(mcqs)}/{num_questions} valid questions, requesting {missing} more")
+        try:
+            extra = _request_mcqs(combined_text, missing, [mcq["question"] for mcq in mcqs])
+        except Exception as e:
+            print(f"Follow-up generation failed: {e}")
+            break
+        add_unique(extra)
+
+    if not mcqs:
+        raise HTTPException(status_code=500, detail="Failed to parse MCQs from model response")
+
+    return mcqs[:num_questions]
 
 @app.get("/")
 def home():
@@ -224,16 +446,144 @@ async def upload_material(title: str, file: UploadFile = File(...), db: Session
     db.refresh(material)
     return {"message": "File uploaded successfully", "material_id": material.id}
 
+@app.post("/materials/upload/batch")
+def upload_materials_batch(files: List[UploadFile] = File(...)):
+    """
+    Upload many PDFs (or zip archives of PDFs) in one request.
+    Validation, hashing and text extraction run in parallel worker processes.
+    Progress is streamed as one JSON object per line; all Material rows are
+    inserted in a single transaction at the end.
+    """
+    staged, skipped = _stage_batch(files)
+
+    def run_batch():
+        # Staged files not yet removed or moved, and moved files not yet committed.
+        # Whatever is left in these when the stream ends (error, disconnect) is deleted.
+        pending = {item["staged_path"] for item in staged}
+        moved = []
+        committed = False
+        db = None
+        try:
+            for report in skipped:
+                yield json.dumps({"event": "file", **report}) + "\n"
+
+            accepted = []
+            seen_hashes = set()
+            if staged:
+                pool = get_ingest_pool()
+                try:
+                    futures = {pool.submit(ingest_file, item["staged_path"]): item for item in staged}
+                except BrokenProcessPool:
+                    reset_ingest_pool(pool)
+                    pool = get_ingest_pool()
+                    futures = {pool.submit(ingest_file, item["staged_path"]): item for item in staged}
+
+                for future in as_completed(futures):
+                    item = futures[future]
+                    try:
+                        report = future.result()
+                    except Exception as e:
+                        if isinstance(e, BrokenProcessPool):
+                            reset_ingest_pool(pool)
+                        report = {"pages": 0, "error": f"Failed to process file: {str(e)}"}
+                    event = {"event": "file", "filename": item["filename"], "pages": report["pages"]}
+                    if report["error"]:
+                        event.update(status="failed", error=report["error"])
+                    elif report["sha256"] in seen_hashes:
+                        event.update(status="failed", error="Duplicate of another file in this batch")
+                    else:
+                        seen_hashes.add(report["sha256"])
+                        # Keep the worker's text so it is not extracted again later
+                        item["page_texts"] = report["page_texts"]
+                        accepted.append(item)
+                        event.update(status="ok", text_chars=report["text_chars"])
+                    if event["status"] == "failed":
+                        os.remove(item["staged_path"])
+                        pending.discard(item["staged_path"])
+                    yield json.dumps(event) + "\n"
+
+            materials = []
+            for item in accepted:
+                file_location = _stored_upload_path(item["filename"])
+                os.replace(item["staged_path"], file_location)
+                pending.discard(item["staged_path"])
+                moved.append(file_location)
+                item["stored_path"] = file_location
+                materials.append(Material(
+                    title=os.path.splitext(item["filename"])[0],
+                    filename=item["filename"],
+                    filepath=file_location
+                ))
+            db = SessionLocal()
+            db.add_all(materials)
+            db.commit()
+            committed = True
+            for item in accepted:
+                warm_pages(item["stored_path"], item["page_texts"])
+            yield json.dumps({
+                "event": "done",
+                "uploaded": len(materials),
+                "failed": len(skipped) + len(staged) - len(accepted),
+                "material_ids": [m.id for m in materials]
+            }) + "\n"
+        except Exception as e:
+            if db is not None:
+                db.rollback()
+            yield json.dumps({"event": "error", "error": f"Failed to save materials: {str(e)}"}) + "\n"
+        finally:
+            if db is not None:
+                db.close()
+            leftovers = list(pending) if committed else list(pending) + moved
+            for path in leftovers:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    return StreamingResponse(run_batch(), media_type="application/x-ndjson")
+
 @app.get("/materials")
 def list_materials(db: Session = Depends(get_db)):
     return db.query(Material).all()
 
 @app.get("/materials/download/{material_id}")
-def download_material(material_id: int, db: Session = Depends(get_db)):
+def download_material(material_id: int, request: Request, db: Session = Depends(get_db)):
+    """Download a material. Supports Range requests and ETag revalidation."""
     material = db.query(Material).filter(Material.id == material_id).first()
-    if not material:
+    if not material or not material.filepath or not os.path.exists(material.filepath):
         raise HTTPException(status_code=404, detail="Material not found")
-    return FileResponse(material.filepath, filename=material.filename)
+    response = FileResponse(
+        material.filepath,
+        filename=material.filename,
+        stat_result=os.stat(material.filepath),
+        headers={"Cache-Control": "private, no-cache"}
+    )
+    # Let browsers reuse their cached copy instead of downloading the file again
+    if _etag_matches(request.headers.get("if-none-match"), response.headers["etag"]):
+        return Response(status_code=304, headers={"ETag": response.headers["etag"], "Cache-Control": "private, no-cache"})
+    return response
+
+@app.get("/materials/{material_id}/pages")
+def get_material_pages(
+    material_id: int,
+    start: int = Query(1, ge=1),
+    count: int = Query(5, ge=1, le=MAX_PAGES_PER_REQUEST),
+    db: Session = Depends(get_db)
+):
+    """Get extracted text for a range of pages (1-based) without downloading the PDF"""
+    material = db.query(Material).filter(Material.id == material_id).first()
+    if not material or not material.filepath or not os.path.exists(material.filepath):
+        raise HTTPException(status_code=404, detail="Material not found")
+    try:
+        total_pages, pages = read_pages(material.filepath, start, count)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Failed to read material pages: {str(e)}")
+    if start > total_pages and total_pages > 0:
+        raise HTTPException(status_code=400, detail=f"start must be between 1 and {total_pages}")
+    return {
+        "material_id": material_id,
+        "total_pages": total_pages,
+        "start": start,
+        "pages": [{"page": number, "text": text} for number, text in pages]
+    }
 
 @app.delete("/materials/{material_id}")
 def delete_material_endpoint(material_id: int, db: Session = Depends(get_db)):
@@ -284,7 +634,7 @@ def create_exam(
     request: ExamRequest,
     db: Session = Depends(get_db)
 ):
-    print(f"Received request: material_ids={request.material_ids}, num_questions={request.num_questions}")
+    print(f"Received request: material_ids={request.material_ids}, num_questions={request.num_questions}, regenerate={request.regenerate}")
     
     file_paths = []
     for mid in request.material_ids:
@@ -295,8 +645,12 @@ def create_exam(
     if not file_paths:
         raise HTTPException(status_code=404, detail="No valid materials found")
 
-    mcqs = generate_mcqs(file_paths, num_questions=request.num_questions)
-    return {"exam": mcqs}
+    return generate_mcqs_cached(
+        file_paths,
+        num_questions=request.num_questions,
+        regenerate=request.regenerate,
+        candidate=request.candidate
+    )
 
 @app.post("/exam/publish")
 def publish_exam(request: PublishExamRequest, db: Session = Depends(get_db)):
@@ -366,7 +720,7 @@ def generate_feedback(percentage: float) -> str:
         "Avoid generic one-liners. Write a thoughtful paragraph (3-4 sentences) that feels personal and encouraging."
     )
     try:
-        response = ollama.chat(model='llama3:latest', messages=[
+        response = ollama.chat(model=OLLAMA_MODEL, messages=[
             {'role': 'user', 'content': prompt}
         ])
         return response['message']['content']
@@ -441,4 +795,71 @@ def get_all_results():
         "total_questions": r['total_questions'],
         "percentage": r['percentage'],
         "completed_at": r['completed_at']
-    } for r in results]
\ No newline at end of file
+    } for r in results]
+
+
+@app.get("/results/export")
+def export_results(
+    export_format: str = Query("csv", alias="format"),
+    exam_id: Optional[int] = None,
+    layout: str = "flat"
+):
+    """
+    Download consolidated results as CSV or Excel.
+    CSV is streamed in chunks; Excel is built with a write-only workbook.
+    layout=per_exam puts each exam on its own sheet (xlsx only).
+    """
+    if export_format not in ("csv", "xlsx"):
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'xlsx'")
+    if layout not in ("flat", "per_exam"):
+        raise HTTPException(status_code=400, detail="layout must be 'flat' or 'per_exam'")
+    if exam_id is not None and not get_exam_by_id(exam_id):
+        raise HTTPException(status_code=404, detail="Exam not found")
+
+    base_name = f"exam_{exam_id}_results" if exam_id is not None else "all_results"
+
+    if export_format == "csv":
+        return StreamingResponse(
+            stream_results_csv(exam_id),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{base_name}.csv"'}
+        )
+
+    path = export_results_xlsx(exam_id, per_exam=(layout == "per_exam"))
+    return FileResponse(
+        path,
+        filename=f"{base_name}.xlsx",
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        background=BackgroundTask(os.remove, path)
+    )
+
+@app.get("/events")
+async def event_stream(request: Request):
+    """
+    Server-sent events for the employer dashboard: result-added, exam-published
+    and exam-deleted. A 'resync' event means the client may have missed events
+    and should refetch.
+    """
+    async def stream():
+        subscriber = events.subscribe()
+        try:
+            yield "retry: 3000\n\n"
+            # Past events are not kept, so every connection (first or reconnect) starts
+            # with a resync. It is sent after subscribing, so the client's fetch cannot
+            # miss an event published while the stream was being set up.
+            yield events.format_sse(events.resync_message())
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield events.format_sse(message)
+        finally:
+            events.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,2 @@
+from .ingest import extract_text_from_pdf, ingest_file, get_ingest_pool, reset_ingest_pool
+from .pages import read_pages, warm_pages, clear_page_cache
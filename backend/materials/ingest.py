@@ -0,0 +1,62 @@
+import os
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+import PyPDF2
+from .pages import read_all_text
+
+PDF_MAGIC = b"%PDF-"
+_pool = None
+_pool_lock = Lock()
+
+def extract_text_from_pdf(file_path: str) -> str:
+    return read_all_text(file_path)
+
+def get_ingest_pool() -> ProcessPoolExecutor:
+    """Process pool shared by every batch upload, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn keeps workers from inheriting the server's threads and open handles
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+def reset_ingest_pool(pool: ProcessPoolExecutor):
+    """Discard a broken pool so the next batch starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def ingest_file(file_path: str) -> dict:
+    """
+    Validate, hash and extract text from one staged upload.
+    Runs inside a worker process, so it never raises: failures are reported in 'error'.
+    """
+    report = {"path": file_path, "sha256": None, "pages": 0, "text_chars": 0, "page_texts": [], "error": None}
+    try:
+        h = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            if f.read(len(PDF_MAGIC)) != PDF_MAGIC:
+                report["error"] = "Not a PDF file"
+                return report
+            f.seek(0)
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        report["sha256"] = h.hexdigest()
+
+        with open(file_path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            report["pages"] = len(reader.pages)
+            for page in reader.pages:
+                page_text = page.extract_text() or ""
+                report["page_texts"].append(page_text)
+                report["text_chars"] += len(page_text)
+    except Exception as e:
+        report["error"] = f"Failed to read PDF: {str(e)}"
+    return report
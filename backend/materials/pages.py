@@ -0,0 +1,88 @@
+import mmap
+import os
+from collections import OrderedDict
+from threading import Lock
+import PyPDF2
+
+# Upper bound on cached page text, shared by every request
+MAX_CACHED_CHARS = 20 * 1024 * 1024
+# Cost charged against MAX_CACHED_CHARS for each cached page count
+PAGE_COUNT_WEIGHT = 64
+# Pages are numbered from 1, so page 0 of a file holds its page count
+_COUNT_PAGE = 0
+_lock = Lock()
+_page_cache = OrderedDict()
+_cached_chars = 0
+
+def _file_key(file_path: str) -> tuple:
+    # Includes size and mtime so a replaced file never serves stale pages
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+def _weight(value) -> int:
+    return len(value) if isinstance(value, str) else PAGE_COUNT_WEIGHT
+
+def _cache_get(key):
+    with _lock:
+        value = _page_cache.get(key)
+        if value is not None:
+            _page_cache.move_to_end(key)
+        return value
+
+def _cache_put(key, value):
+    global _cached_chars
+    with _lock:
+        if key in _page_cache:
+            return
+        _page_cache[key] = value
+        _cached_chars += _weight(value)
+        while _cached_chars > MAX_CACHED_CHARS and len(_page_cache) > 1:
+            _, evicted = _page_cache.popitem(last=False)
+            _cached_chars -= _weight(evicted)
+
+def clear_page_cache():
+    global _cached_chars
+    with _lock:
+        _page_cache.clear()
+        _cached_chars = 0
+
+def read_pages(file_path: str, start: int, count: int) -> tuple:
+    """
+    Return (total_pages, [(page_number, text), ...]) for pages start..start+count-1 (1-based).
+    Only pages missing from the LRU cache are parsed, from a memory-mapped file.
+    """
+    file_key = _file_key(file_path)
+    total_pages = _cache_get(file_key + (_COUNT_PAGE,))
+    if total_pages is not None:
+        wanted = range(start, min(start + count, total_pages + 1))
+        cached = [(n, _cache_get(file_key + (n,))) for n in wanted]
+        if all(text is not None for _, text in cached):
+            return total_pages, cached
+
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            reader = PyPDF2.PdfReader(mapped)
+            total_pages = len(reader.pages)
+            _cache_put(file_key + (_COUNT_PAGE,), total_pages)
+
+            pages = []
+            for n in range(start, min(start + count, total_pages + 1)):
+                key = file_key + (n,)
+                text = _cache_get(key)
+                if text is None:
+                    text = reader.pages[n - 1].extract_text() or ""
+                    _cache_put(key, text)
+                pages.append((n, text))
+    return total_pages, pages
+
+def warm_pages(file_path: str, page_texts: list):
+    """Seed the cache with text already extracted elsewhere (e.g. by the batch ingest workers)"""
+    file_key = _file_key(file_path)
+    _cache_put(file_key + (_COUNT_PAGE,), len(page_texts))
+    for n, text in enumerate(page_texts, start=1):
+        _cache_put(file_key + (n,), text)
+
+def read_all_text(file_path: str) -> str:
+    """Full text of a PDF, one line break after each non-empty page, served from the page cache"""
+    _, pages = read_pages(file_path, 1, 10 ** 9)
+    return "".join(text + "\n" for _, text in pages if text)
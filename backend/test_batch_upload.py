@@ -0,0 +1,196 @@
+from fastapi.testclient import TestClient
+from main import app
+import io
+import json
+import os
+import sys
+import zipfile
+from PyPDF2 import PdfWriter
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+client = TestClient(app)
+
+def _make_pdf(pages=1):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+def test_batch_upload_flow():
+    print("1. Building batch (two PDFs, a zip, and an invalid file)...")
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("nested/batch_test_zipped.pdf", _make_pdf(3))
+        zf.writestr("notes.txt", "not a pdf")
+
+    files = [
+        ("files", ("batch_test_one.pdf", _make_pdf(1), "application/pdf")),
+        ("files", ("batch_test_two.pdf", _make_pdf(2), "application/pdf")),
+        ("files", ("batch_test_bundle.zip", archive.getvalue(), "application/zip")),
+        ("files", ("batch_test_bad.pdf", b"definitely not a pdf", "application/pdf")),
+    ]
+
+    print("2. Uploading batch...")
+    response = client.post("/materials/upload/batch", files=files)
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+
+    per_file = {e["filename"]: e for e in events if e["event"] == "file"}
+    assert per_file["batch_test_one.pdf"]["status"] == "ok"
+    assert per_file["batch_test_zipped.pdf"]["pages"] == 3
+    assert per_file["notes.txt"]["status"] == "failed"
+    assert per_file["batch_test_bad.pdf"]["status"] == "failed"
+    print("SUCCESS: Per-file progress reported")
+
+    done = events[-1]
+    assert done["event"] == "done"
+    assert done["uploaded"] == 3
+    assert done["failed"] == 2
+
+    print("3. Verifying materials were stored...")
+    materials = {m["id"]: m for m in client.get("/materials").json()}
+    for material_id in done["material_ids"]:
+        assert material_id in materials
+        assert os.path.exists(materials[material_id]["filepath"])
+        client.delete(f"/materials/{material_id}")
+    assert not any(name.startswith("batch_test_bad") for name in os.listdir("uploaded_materials"))
+    assert not any(name.startswith(".staging-") for name in os.listdir("uploaded_materials"))
+    print("SUCCESS: Batch upload verified")
+
+def test_batch_upload_same_names(monkeypatch):
+    print("4. Uploading two zip members with the same file name...")
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("week1/batch_test_notes.pdf", _make_pdf(1))
+        zf.writestr("week2/batch_test_notes.pdf", _make_pdf(4))
+
+    response = client.post("/materials/upload/batch", files=[
+        ("files", ("batch_test_weeks.zip", archive.getvalue(), "application/zip"))
+    ])
+    assert response.status_code == 200
+    done = [json.loads(line) for line in response.text.splitlines() if line][-1]
+    assert done["event"] == "done" and done["uploaded"] == 2
+
+    materials = {m["id"]: m for m in client.get("/materials").json()}
+    stored = [materials[material_id] for material_id in done["material_ids"]]
+    assert all(m["filename"] == "batch_test_notes.pdf" for m in stored)
+    assert stored[0]["filepath"] != stored[1]["filepath"]
+
+    # Text extracted by the ingest workers is served from the page cache
+    from materials import pages
+
+    def fail(*args, **kwargs):
+        raise AssertionError("PDF was parsed again")
+
+    monkeypatch.setattr(pages.PyPDF2, "PdfReader", fail)
+    page_counts = sorted(client.get(f"/materials/{m['id']}/pages").json()["total_pages"] for m in stored)
+    assert page_counts == [1, 4]
+
+    # Deleting one material must leave the other's file in place
+    client.delete(f"/materials/{stored[0]['id']}")
+    assert os.path.exists(stored[1]["filepath"])
+    client.delete(f"/materials/{stored[1]['id']}")
+    print("SUCCESS: Same-named files stored separately")
+
+def test_batch_upload_failed_commit(monkeypatch):
+    print("5. Failed commit leaves no files behind...")
+    import main
+    session_factory = main.SessionLocal
+
+    class FailingSession:
+        def __init__(self):
+            self.session = session_factory()
+        def add_all(self, items):
+            self.session.add_all(items)
+        def commit(self):
+            raise RuntimeError("disk full")
+        def rollback(self):
+            self.session.rollback()
+        def close(self):
+            self.session.close()
+
+    before = set(os.listdir("uploaded_materials"))
+    monkeypatch.setattr(main, "SessionLocal", FailingSession)
+    response = client.post("/materials/upload/batch", files=[
+        ("files", ("batch_test_rollback.pdf", _make_pdf(1), "application/pdf"))
+    ])
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert events[-1]["event"] == "error"
+    assert set(os.listdir("uploaded_materials")) == before
+    print("SUCCESS: Rollback cleanup verified")
+
+def test_batch_upload_file_errors(monkeypatch):
+    print("6. Long names are stored and one unwritable file does not fail the batch...")
+    import main
+    long_name = "batch_test_" + "x" * 229 + ".pdf"
+    real_stage_upload = main._stage_upload
+
+    def flaky_stage_upload(fileobj, filename):
+        if filename == "batch_test_unwritable.pdf":
+            raise OSError("No space left on device")
+        return real_stage_upload(fileobj, filename)
+
+    monkeypatch.setattr(main, "_stage_upload", flaky_stage_upload)
+    response = client.post("/materials/upload/batch", files=[
+        ("files", (long_name, _make_pdf(1), "application/pdf")),
+        ("files", ("batch_test_unwritable.pdf", _make_pdf(1), "application/pdf")),
+        ("files", ("batch_test_valid.pdf", _make_pdf(2), "application/pdf")),
+    ])
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    per_file = {e["filename"]: e for e in events if e["event"] == "file"}
+    assert per_file[long_name]["status"] == "ok"
+    assert per_file["batch_test_unwritable.pdf"]["status"] == "failed"
+    assert per_file["batch_test_valid.pdf"]["status"] == "ok"
+
+    done = events[-1]
+    assert done["event"] == "done" and done["uploaded"] == 2 and done["failed"] == 1
+    materials = {m["id"]: m for m in client.get("/materials").json()}
+    for material_id in done["material_ids"]:
+        assert len(os.path.basename(materials[material_id]["filepath"])) < 255
+        client.delete(f"/materials/{material_id}")
+    print("SUCCESS: Per-file errors verified")
+
+def test_batch_upload_zip_limits(monkeypatch):
+    print("7. Zip members over the file count or size limits are not extracted...")
+    import main
+    small, large = _make_pdf(1), _make_pdf(1) + b"\0" * 4096
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("batch_test_limit_1.pdf", small)
+        zf.writestr("batch_test_limit_big.pdf", large)
+        zf.writestr("batch_test_limit_2.pdf", small)
+        zf.writestr("batch_test_limit_3.pdf", small)
+
+    monkeypatch.setattr(main, "MAX_ZIP_MEMBERS", 2)
+    monkeypatch.setattr(main, "MAX_ZIP_UNCOMPRESSED_BYTES", len(small) * 3)
+    staged_names = []
+    real_stage_upload = main._stage_upload
+
+    def tracking_stage_upload(fileobj, filename):
+        staged_names.append(filename)
+        return real_stage_upload(fileobj, filename)
+
+    monkeypatch.setattr(main, "_stage_upload", tracking_stage_upload)
+    response = client.post("/materials/upload/batch", files=[
+        ("files", ("batch_test_limits.zip", archive.getvalue(), "application/zip"))
+    ])
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    per_file = {e["filename"]: e for e in events if e["event"] == "file"}
+    assert per_file["batch_test_limit_big.pdf"]["status"] == "failed"
+    assert per_file["batch_test_limit_3.pdf"]["status"] == "failed"
+    assert staged_names == ["batch_test_limit_1.pdf", "batch_test_limit_2.pdf"]
+
+    done = events[-1]
+    assert done["uploaded"] == 1 and done["failed"] == 3
+    for material_id in done["material_ids"]:
+        client.delete(f"/materials/{material_id}")
+    print("SUCCESS: Zip limits verified")
+
+if __name__ == "__main__":
+    test_batch_upload_flow()
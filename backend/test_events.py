@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+import threading
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+import events
+from main import event_stream
+from starlette.requests import Request
+from excel_utils import init_excel_db, write_exam, delete_exam
+
+async def _drain(subscriber):
+    # Let call_soon_threadsafe callbacks run before reading the queue
+    await asyncio.sleep(0.05)
+    messages = []
+    while not subscriber.queue.empty():
+        messages.append(subscriber.queue.get_nowait())
+    return messages
+
+def test_events_flow():
+    async def scenario():
+        subscriber = events.subscribe()
+        try:
+            print("1. Publishing exam events from a worker thread...")
+            init_excel_db()
+            exam_ids = []
+            worker = threading.Thread(target=lambda: exam_ids.append(
+                write_exam("Events Test Exam", [{"question": "Q1", "options": {"A": "1", "B": "2"}, "answer": "A"}])
+            ))
+            worker.start()
+            worker.join()
+            delete_exam(exam_ids[0])
+
+            messages = await _drain(subscriber)
+            assert [m["type"] for m in messages] == ["exam-published", "exam-deleted"]
+            assert messages[0]["data"]["id"] == exam_ids[0]
+            assert messages[0]["data"]["question_count"] == 1
+            assert "event: exam-deleted" in events.format_sse(messages[1])
+            print("SUCCESS: Exam events delivered")
+
+            print("2. Slow clients get a resync instead of an unbounded backlog...")
+            for i in range(events.CLIENT_QUEUE_SIZE + 5):
+                events.publish("result-added", {"id": i})
+            messages = await _drain(subscriber)
+            assert len(messages) <= events.CLIENT_QUEUE_SIZE
+            assert events.RESYNC_EVENT in [m["type"] for m in messages]
+            print("SUCCESS: Backpressure verified")
+        finally:
+            events.unsubscribe(subscriber)
+
+    asyncio.run(scenario())
+
+async def _first_chunks(headers, count):
+    async def receive():
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/events",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    response = await event_stream(Request(scope, receive))
+    chunks = []
+    async for chunk in response.body_iterator:
+        chunks.append(chunk)
+        if len(chunks) == count:
+            break
+    await response.body_iterator.aclose()
+    return chunks
+
+def test_connect_resync():
+    print("3. New and reconnecting clients are told to resync...")
+    fresh = asyncio.run(_first_chunks({}, 2))
+    assert "event: resync" in fresh[1]
+    assert f"id: {events.last_event_id()}\n" in fresh[1]
+
+    reconnected = asyncio.run(_first_chunks({"Last-Event-ID": "3"}, 2))
+    assert "event: resync" in reconnected[1]
+    print("SUCCESS: Connect resync verified")
+
+if __name__ == "__main__":
+    test_events_flow()
@@ -0,0 +1,127 @@
+from fastapi.testclient import TestClient
+from main import app
+import io
+import os
+import sys
+from openpyxl import load_workbook
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+client = TestClient(app)
+
+def test_export_flow():
+    print("1. Publishing Exam and submitting a result...")
+    exam_data = {
+        "title": "Export Test Exam",
+        "questions": [{"question": "Q1", "options": {"A": "1", "B": "2"}, "answer": "A"}]
+    }
+    response = client.post("/exam/publish", json=exam_data)
+    assert response.status_code == 200
+    exam_id = response.json()["exam_id"]
+
+    result_data = {
+        "exam_id": exam_id,
+        "employee_name": "Export User",
+        "score": 1,
+        "total_questions": 1,
+        "percentage": "100.0"
+    }
+    response = client.post("/exam/submit", json=result_data)
+    assert response.status_code == 200
+
+    print("2. Exporting CSV...")
+    response = client.get(f"/results/export?format=csv&exam_id={exam_id}")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.strip().splitlines()
+    assert lines[0].startswith("id,exam_id,exam_title,employee_name")
+    assert len(lines) == 2
+    assert "Export User" in lines[1]
+    print("SUCCESS: CSV export verified")
+
+    print("3. Exporting XLSX (one sheet per exam)...")
+    response = client.get(f"/results/export?format=xlsx&exam_id={exam_id}&layout=per_exam")
+    assert response.status_code == 200
+    wb = load_workbook(io.BytesIO(response.content), read_only=True)
+    assert wb.sheetnames == [f"Exam_{exam_id}_Export_Test_Exam"[:31]]
+    rows = list(wb.worksheets[0].iter_rows(values_only=True))
+    assert rows[1][3] == "Export User"
+    print("SUCCESS: XLSX export verified")
+
+    print("4. Rejecting bad requests...")
+    assert client.get("/results/export?format=pdf").status_code == 400
+    assert client.get("/results/export?exam_id=999999").status_code == 404
+
+    client.delete(f"/exam/{exam_id}")
+
+def test_export_xlsx_cleanup_on_failure(monkeypatch):
+    print("5. Failed workbook save removes its temp file...")
+    import excel_utils
+    created = []
+    real_mkstemp = excel_utils.tempfile.mkstemp
+
+    def tracking_mkstemp(*args, **kwargs):
+        fd, path = real_mkstemp(*args, **kwargs)
+        created.append(path)
+        return fd, path
+
+    def failing_save(self, filename):
+        # Finish the sheets as a real save would before it fails
+        for ws in self.worksheets:
+            ws.close()
+        raise OSError("disk full")
+
+    monkeypatch.setattr(excel_utils.tempfile, "mkstemp", tracking_mkstemp)
+    monkeypatch.setattr(excel_utils.Workbook, "save", failing_save)
+    try:
+        excel_utils.export_results_xlsx()
+        assert False, "save should have failed"
+    except OSError:
+        pass
+    assert created and not any(os.path.exists(path) for path in created)
+    print("SUCCESS: Temp file cleanup verified")
+
+def test_export_skips_corrupt_workbook():
+    print("6. A corrupt exam workbook does not break the export...")
+    import excel_utils
+    exam_ids = []
+    for title in ("Export Good Exam", "Export Corrupt Exam"):
+        exam_data = {
+            "title": title,
+            "questions": [{"question": "Q1", "options": {"A": "1", "B": "2"}, "answer": "A"}]
+        }
+        response = client.post("/exam/publish", json=exam_data)
+        assert response.status_code == 200
+        exam_ids.append(response.json()["exam_id"])
+    good_id, corrupt_id = exam_ids
+
+    try:
+        result_data = {
+            "exam_id": good_id,
+            "employee_name": "Good User",
+            "score": 1,
+            "total_questions": 1,
+            "percentage": "100.0"
+        }
+        assert client.post("/exam/submit", json=result_data).status_code == 200
+        corrupt_exam = next(e for e in excel_utils.read_exams() if e['id'] == corrupt_id)
+        with open(corrupt_exam['filename'], "wb") as f:
+            f.write(b"not a workbook")
+
+        response = client.get("/results/export?format=csv")
+        assert response.status_code == 200
+        assert "Good User" in response.text
+
+        response = client.get("/results/export?format=xlsx")
+        assert response.status_code == 200
+        wb = load_workbook(io.BytesIO(response.content), read_only=True)
+        names = [row[3] for row in wb.worksheets[0].iter_rows(min_row=2, values_only=True)]
+        assert "Good User" in names
+        print("SUCCESS: Corrupt workbook skipped")
+    finally:
+        for exam_id in exam_ids:
+            client.delete(f"/exam/{exam_id}")
+
+if __name__ == "__main__":
+    test_export_flow()
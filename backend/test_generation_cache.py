@@ -0,0 +1,76 @@
+import os
+import sys
+import tempfile
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+import generation_cache
+
+def test_generation_cache_flow():
+    original_dir = generation_cache.CACHE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        generation_cache.CACHE_DIR = os.path.join(tmp, "cache")
+        material = os.path.join(tmp, "material.pdf")
+        with open(material, "wb") as f:
+            f.write(b"study material")
+
+        print("1. Keys depend on content, question count, model and prompt version...")
+        key = generation_cache.make_key([material], 5, "llama3:latest", 1)
+        assert key == generation_cache.make_key([material], 5, "llama3:latest", 1)
+        assert key != generation_cache.make_key([material], 6, "llama3:latest", 1)
+        assert key != generation_cache.make_key([material], 5, "llama3:latest", 2)
+
+        print("2. Storing candidates...")
+        assert generation_cache.get_candidates(key) == []
+        ids = [generation_cache.add_candidate(key, [{"question": f"Q{i}"}])
+               for i in range(generation_cache.MAX_CANDIDATES_PER_KEY + 2)]
+        candidates = generation_cache.get_candidates(key)
+        assert len(candidates) == generation_cache.MAX_CANDIDATES_PER_KEY
+        # Ids stay attached to the same set after older candidates are trimmed
+        assert [c["id"] for c in candidates] == ids[2:]
+        assert all(c["questions"] == [{"question": f"Q{c['id']}"}] for c in candidates)
+
+        print("3. Changing the material changes the key...")
+        with open(material, "wb") as f:
+            f.write(b"revised study material")
+        assert generation_cache.make_key([material], 5, "llama3:latest", 1) != key
+
+        print("4. Evicting least recently used entries...")
+        old_limit = generation_cache.MAX_CACHE_ENTRIES
+        generation_cache.MAX_CACHE_ENTRIES = 1
+        try:
+            generation_cache.add_candidate("other", [{"question": "Other"}])
+            assert generation_cache.get_candidates(key) == []
+            assert [c["questions"] for c in generation_cache.get_candidates("other")] == [[{"question": "Other"}]]
+        finally:
+            generation_cache.MAX_CACHE_ENTRIES = old_limit
+            generation_cache.CACHE_DIR = original_dir
+        print("SUCCESS: Generation cache verified")
+
+def test_short_sets_not_cached(monkeypatch):
+    print("5. Short question sets are returned but not cached...")
+    import main
+    original_dir = generation_cache.CACHE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        generation_cache.CACHE_DIR = os.path.join(tmp, "cache")
+        material = os.path.join(tmp, "material.pdf")
+        with open(material, "wb") as f:
+            f.write(b"short material")
+        try:
+            monkeypatch.setattr(main, "generate_mcqs", lambda paths, num_questions: [{"question": "Only one"}])
+            result = main.generate_mcqs_cached([material], num_questions=3)
+            assert result["exam"] == [{"question": "Only one"}]
+            assert result["candidate"] is None and result["candidates"] == []
+
+            full = [{"question": f"Q{i}"} for i in range(3)]
+            monkeypatch.setattr(main, "generate_mcqs", lambda paths, num_questions: full)
+            assert main.generate_mcqs_cached([material], num_questions=3)["cached"] is False
+            result = main.generate_mcqs_cached([material], num_questions=3)
+            assert result["cached"] is True and result["exam"] == full
+        finally:
+            generation_cache.CACHE_DIR = original_dir
+    print("SUCCESS: Only complete sets cached")
+
+if __name__ == "__main__":
+    test_generation_cache_flow()
@@ -0,0 +1,85 @@
+from fastapi.testclient import TestClient
+from main import app
+import io
+import os
+import sys
+from PyPDF2 import PdfWriter
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from materials import pages
+
+client = TestClient(app)
+
+def _make_pdf(num_pages):
+    writer = PdfWriter()
+    for _ in range(num_pages):
+        writer.add_blank_page(width=200, height=200)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+def test_material_pages_flow():
+    print("1. Uploading a 7 page material...")
+    content = _make_pdf(7)
+    response = client.post(
+        "/materials/upload?title=Pages Test",
+        files={"file": ("pages_test.pdf", content, "application/pdf")}
+    )
+    assert response.status_code == 200
+    material_id = response.json()["material_id"]
+
+    try:
+        print("2. Reading a page window...")
+        response = client.get(f"/materials/{material_id}/pages?start=6&count=5")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_pages"] == 7
+        assert [p["page"] for p in data["pages"]] == [6, 7]
+        assert client.get(f"/materials/{material_id}/pages?start=8").status_code == 400
+        assert client.get(f"/materials/{material_id}/pages?count=0").status_code == 422
+        print("SUCCESS: Page window verified")
+
+        print("3. Downloading a byte range...")
+        response = client.get(f"/materials/download/{material_id}", headers={"Range": "bytes=0-9"})
+        assert response.status_code == 206
+        assert response.content == content[:10]
+
+        etag = client.get(f"/materials/download/{material_id}").headers["etag"]
+        response = client.get(f"/materials/download/{material_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        response = client.get(f"/materials/download/{material_id}", headers={"If-None-Match": f'"other", W/{etag}'})
+        assert response.status_code == 304
+        response = client.get(f"/materials/download/{material_id}", headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+        print("SUCCESS: Range and revalidation verified")
+    finally:
+        client.delete(f"/materials/{material_id}")
+
+def test_page_cache_reuse(monkeypatch):
+    print("4. Serving repeat reads from the page cache...")
+    sample = os.path.join("uploaded_materials", "s12859-019-3119-4.pdf")
+    pages.clear_page_cache()
+    total, first = pages.read_pages(sample, 1, 2)
+    assert total > 2 and len(first) == 2
+
+    def fail(*args, **kwargs):
+        raise AssertionError("PDF was parsed again")
+
+    monkeypatch.setattr(pages.PyPDF2, "PdfReader", fail)
+    assert pages.read_pages(sample, 1, 2) == (total, first)
+    print("SUCCESS: Page cache verified")
+
+def test_page_cache_bounded(monkeypatch):
+    print("5. Page counts are evicted along with page text...")
+    sample = os.path.join("uploaded_materials", "s12859-019-3119-4.pdf")
+    pages.clear_page_cache()
+    monkeypatch.setattr(pages, "MAX_CACHED_CHARS", 1)
+    pages.read_pages(sample, 1, 3)
+    assert len(pages._page_cache) == 1
+    pages.clear_page_cache()
+    print("SUCCESS: Page cache bound verified")
+
+if __name__ == "__main__":
+    test_material_pages_flow()
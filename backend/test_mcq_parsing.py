@@ -0,0 +1,66 @@
+import json
+import os
+import sys
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+import main
+from main import parse_mcqs_from_json, _parse_mcq_lines
+
+def _mcq(n, answer="A"):
+    return {"question": f"Question {n}?", "options": {"A": "a", "B": "b", "C": "c", "D": "d"}, "answer": answer}
+
+def test_json_parsing():
+    print("1. Parsing JSON-mode output...")
+    text = json.dumps({"questions": [
+        _mcq(1),
+        {"question": "", "options": {"A": "a", "B": "b"}, "answer": "A"},
+        {"question": "Bad answer?", "options": {"A": "a", "B": "b"}, "answer": "Z"},
+        _mcq(2, answer="b) because"),
+    ]})
+    mcqs = parse_mcqs_from_json(text)
+    assert [m["question"] for m in mcqs] == ["Question 1?", "Question 2?"]
+    assert mcqs[1]["answer"] == "B"
+    assert parse_mcqs_from_json("Question 1: not json") is None
+    print("SUCCESS: JSON parsing verified")
+
+def test_line_parsing_fallback():
+    print("2. Parsing line-format output...")
+    text = (
+        "Question 1: What?\nA) one\nB. two\nC) three\nD) four\nAnswer: B\n\n"
+        "Q2) Only one option\nA) x\n\n"
+        "Question 3: Invalid answer?\nA) one\nB) two\nAnswer: Z\n\n"
+        "Question 4: No answer?\nA) one\nB) two\n"
+    )
+    mcqs = _parse_mcq_lines(text)
+    assert len(mcqs) == 1
+    assert mcqs[0]["options"]["B"] == "two"
+    assert mcqs[0]["answer"] == "B"
+    print("SUCCESS: Line parsing verified")
+
+def test_partial_retry(monkeypatch):
+    print("3. Requesting only the missing questions...")
+    calls = []
+    replies = [
+        {"questions": [_mcq(1), _mcq(2), _mcq(2), {"question": "broken"}]},
+        {"questions": [_mcq(2), _mcq(3)]},
+    ]
+
+    def fake_chat(model, messages, format=None):
+        calls.append(messages[-1]["content"])
+        return {"message": {"content": json.dumps(replies[len(calls) - 1])}}
+
+    monkeypatch.setattr(main.ollama, "chat", fake_chat)
+    monkeypatch.setattr(main, "extract_text_from_pdf", lambda path: "material")
+
+    mcqs = main.generate_mcqs(["unused.pdf"], num_questions=3)
+    assert [m["question"] for m in mcqs] == ["Question 1?", "Question 2?", "Question 3?"]
+    assert len(calls) == 2
+    assert "Create exactly 1 multiple-choice" in calls[1]
+    assert "Question 2?" in calls[1]
+    print("SUCCESS: Partial retry verified")
+
+if __name__ == "__main__":
+    test_json_parsing()
+    test_line_parsing_fallback()
@@ -39,6 +39,8 @@ export default function StudyApp() {
   const [showResults, setShowResults] = useState(false);
   const [uploadTitle, setUploadTitle] = useState('');
   const [uploadFile, setUploadFile] = useState(null);
+  const [uploadFiles, setUploadFiles] = useState([]);
+  const [uploadProgress, setUploadProgress] = useState('');
   const [numQuestions, setNumQuestions] = useState(10);
   const [editingMaterial, setEditingMaterial] = useState(null);
   const [loading, setLoading] = useState(false);
@@ -52,6 +54,7 @@ export default function StudyApp() {
   const [passcode, setPasscode] = useState('');
   const [examResults, setExamResults] = useState([]);
   const [examFeedback, setExamFeedback] = useState('');
+  const [readingMaterial, setReadingMaterial] = useState(null);
 
   const showToast = (message, type = 'info') => {
     setToast({ message, type });
@@ -63,13 +66,37 @@ export default function StudyApp() {
       if (userType === 'employee') {
         fetchPublishedExams();
       }
-      if (userType === 'employer') {
-        fetchExamResults();
-        fetchPublishedExams();
-      }
+      // Employer results and exams are loaded by the 'resync' event sent when the
+      // live updates stream connects, so no update can slip in before it
     }
   }, [userType]);
 
+  // Live dashboard updates: apply server-sent deltas instead of refetching everything
+  useEffect(() => {
+    if (userType !== 'employer') return;
+
+    const source = new EventSource(`${API_BASE}/events`);
+    source.addEventListener('result-added', (e) => {
+      const result = JSON.parse(e.data);
+      setExamResults(prev => prev.some(r => r.exam_id === result.exam_id && r.id === result.id) ? prev : [...prev, result]);
+    });
+    source.addEventListener('exam-published', (e) => {
+      const published = JSON.parse(e.data);
+      setPublishedExams(prev => prev.some(ex => ex.id === published.id) ? prev : [...prev, published]);
+    });
+    source.addEventListener('exam-deleted', (e) => {
+      const { id } = JSON.parse(e.data);
+      setPublishedExams(prev => prev.filter(ex => ex.id !== id));
+      setExamResults(prev => prev.filter(r => r.exam_id !== id));
+    });
+    source.addEventListener('resync', () => {
+      fetchExamResults();
+      fetchPublishedExams();
+    });
+
+    return () => source.close();
+  }, [userType]);
+
   const fetchExamResults = async () => {
     try {
       const response = await fetch(`${API_BASE}/results/all`);
@@ -103,7 +130,70 @@ export default function StudyApp() {
     }
   };
 
+  const handleBatchUpload = async () => {
+    const formData = new FormData();
+    uploadFiles.forEach(file => formData.append('files', file));
+
+    try {
+      setLoading(true);
+      const response = await fetch(`${API_BASE}/materials/upload/batch`, {
+        method: 'POST',
+        body: formData,
+      });
+
+      if (!response.ok) throw new Error('Upload failed');
+
+      // The server streams one JSON object per line as each file is processed
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = '';
+      let processed = 0;
+      let summary = null;
+      const failures = [];
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+        const lines = buffered.split('\n');
+        buffered = lines.pop();
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          const event = JSON.parse(line);
+          if (event.event === 'file') {
+            processed += 1;
+            if (event.status === 'failed') failures.push(`${event.filename}: ${event.error}`);
+            setUploadProgress(`Processed ${processed} file(s)... ${event.filename}`);
+          } else if (event.event === 'done') {
+            summary = event;
+          } else if (event.event === 'error') {
+            throw new Error(event.error);
+          }
+        }
+      }
+
+      if (!summary) throw new Error('Upload did not complete');
+      showToast(`Uploaded ${summary.uploaded} material(s)` + (summary.failed ? `, ${summary.failed} failed` : ''), summary.failed ? 'info' : 'success');
+      if (failures.length) console.warn('Failed uploads:', failures);
+      setUploadFiles([]);
+      setUploadFile(null);
+      const fileInput = document.querySelector('input[type="file"]');
+      if (fileInput) fileInput.value = '';
+      fetchMaterials();
+    } catch (error) {
+      showToast('Upload failed: ' + error.message, 'error');
+    } finally {
+      setUploadProgress('');
+      setLoading(false);
+    }
+  };
+
   const handleUpload = async () => {
+    const isBatch = uploadFiles.length > 1 || uploadFiles.some(file => file.name.toLowerCase().endsWith('.zip'));
+    if (isBatch) {
+      return handleBatchUpload();
+    }
+
     if (!uploadTitle || !uploadFile) {
       showToast('Please provide both title and file', 'error');
       return;
@@ -124,6 +214,7 @@ export default function StudyApp() {
       showToast('Material uploaded successfully!', 'success');
       setUploadTitle('');
       setUploadFile(null);
+      setUploadFiles([]);
       const fileInput = document.querySelector('input[type="file"]');
       if (fileInput) fileInput.value = '';
       fetchMaterials();
@@ -206,7 +297,20 @@ export default function StudyApp() {
     }
   };
 
-  const handleCreateExam = async () => {
+  const READER_PAGE_COUNT = 3;
+
+  const handleReadMaterial = async (material, start = 1) => {
+    try {
+      const response = await fetch(`${API_BASE}/materials/${material.id}/pages?start=${start}&count=${READER_PAGE_COUNT}`);
+      if (!response.ok) throw new Error('Failed to load pages');
+      const data = await response.json();
+      setReadingMaterial({ material, start, totalPages: data.total_pages, pages: data.pages });
+    } catch (error) {
+      showToast('Error loading material: ' + error.message, 'error');
+    }
+  };
+
+  const handleCreateExam = async (regenerate = false) => {
     if (selectedMaterials.length === 0) {
       showToast('Please select at least one material', 'error');
       return;
@@ -218,7 +322,8 @@ export default function StudyApp() {
 
       const requestBody = {
         material_ids: selectedMaterials,
-        num_questions: numQuestions
+        num_questions: numQuestions,
+        regenerate
       };
 
       console.log('Sending request:', requestBody);
@@ -246,7 +351,7 @@ export default function StudyApp() {
       if (userType === 'employer') {
         setCreatedExam(data.exam);
         setExamTitle('');
-        showToast('Exam created successfully! Now publish it.', 'success');
+        showToast(data.cached ? 'Loaded previously generated exam. Use Regenerate for a new draft.' : 'Exam created successfully! Now publish it.', 'success');
       } else {
         setExam(data.exam);
         setCurrentQuestion(0);
@@ -549,10 +654,28 @@ export default function StudyApp() {
 
         <div className="max-w-7xl mx-auto p-6">
           <div className="bg-white rounded-lg shadow-md p-6 mb-6">
-            <h2 className="text-2xl font-semibold mb-4 flex items-center gap-2">
-              <CheckCircle className="w-6 h-6 text-blue-600" />
-              Exam Results ({examResults.length} Submissions)
-            </h2>
+            <div className="flex items-center justify-between mb-4">
+              <h2 className="text-2xl font-semibold flex items-center gap-2">
+                <CheckCircle className="w-6 h-6 text-blue-600" />
+                Exam Results ({examResults.length} Submissions)
+              </h2>
+              <div className="flex gap-2">
+                <a
+                  href={`${API_BASE}/results/export?format=xlsx&layout=per_exam`}
+                  className="flex items-center gap-2 bg-green-600 text-white px-4 py-2 rounded-lg hover:bg-green-700 text-sm"
+                >
+                  <Download className="w-4 h-4" />
+                  Excel
+                </a>
+                <a
+                  href={`${API_BASE}/results/export?format=csv`}
+                  className="flex items-center gap-2 bg-gray-600 text-white px-4 py-2 rounded-lg hover:bg-gray-700 text-sm"
+                >
+                  <Download className="w-4 h-4" />
+                  CSV
+                </a>
+              </div>
+            </div>
             {examResults.length === 0 ? (
               <p className="text-gray-500 text-center py-8">No exam submissions yet. Employees will see their results here after taking exams.</p>
             ) : (
@@ -569,7 +692,7 @@ export default function StudyApp() {
                   </thead>
                   <tbody className="divide-y divide-gray-200">
                     {examResults.map((result) => (
-                      <tr key={result.id} className="hover:bg-gray-50">
+                      <tr key={`${result.exam_id}-${result.id}`} className="hover:bg-gray-50">
                         <td className="px-4 py-3 text-sm font-medium text-gray-800">{result.employee_name}</td>
                         <td className="px-4 py-3 text-sm text-gray-800">{result.exam_title}</td>
                         <td className="px-4 py-3 text-sm text-gray-800">{result.score}/{result.total_questions}</td>
@@ -639,11 +762,15 @@ export default function StudyApp() {
                 />
               </div>
               <div className="flex-1 min-w-64">
-                <label className="block text-sm font-medium text-gray-700 mb-1">PDF File</label>
+                <label className="block text-sm font-medium text-gray-700 mb-1">PDF Files or Zip (titles come from file names when uploading several)</label>
                 <input
                   type="file"
-                  accept=".pdf"
-                  onChange={(e) => setUploadFile(e.target.files[0])}
+                  accept=".pdf,.zip"
+                  multiple
+                  onChange={(e) => {
+                    setUploadFiles(Array.from(e.target.files));
+                    setUploadFile(e.target.files[0]);
+                  }}
                   className="w-full px-4 py-2 border border-gray-300 rounded-lg"
                 />
               </div>
@@ -652,9 +779,12 @@ export default function StudyApp() {
                 disabled={loading}
                 className="bg-blue-600 text-white px-6 py-2 rounded-lg hover:bg-blue-700 disabled:bg-gray-400 disabled:cursor-not-allowed"
               >
-                {loading ? 'Uploading...' : 'Upload'}
+                {loading ? 'Uploading...' : uploadFiles.length > 1 ? `Upload ${uploadFiles.length} Files` : 'Upload'}
               </button>
             </div>
+            {uploadProgress && (
+              <p className="text-sm text-gray-600 mt-3">{uploadProgress}</p>
+            )}
           </div>
 
           <div className="bg-white rounded-lg shadow-md p-6 mb-6">
@@ -734,12 +864,21 @@ export default function StudyApp() {
                 />
               </div>
               <button
-                onClick={handleCreateExam}
+                onClick={() => handleCreateExam()}
                 disabled={loading || selectedMaterials.length === 0}
                 className="bg-green-600 text-white px-6 py-2 rounded-lg hover:bg-green-700 disabled:bg-gray-400 disabled:cursor-not-allowed"
               >
                 {loading ? 'Creating...' : `Create Exam (${selectedMaterials.length} selected)`}
               </button>
+              {createdExam && (
+                <button
+                  onClick={() => handleCreateExam(true)}
+                  disabled={loading || selectedMaterials.length === 0}
+                  className="bg-gray-600 text-white px-6 py-2 rounded-lg hover:bg-gray-700 disabled:bg-gray-400 disabled:cursor-not-allowed"
+                >
+                  Regenerate
+                </button>
+              )}
             </div>
           </div>
 
@@ -943,19 +1082,69 @@ export default function StudyApp() {
                         <p className="text-sm text-gray-500">{material.filename}</p>
                       </div>
                     </div>
-                    <button
-                      onClick={() => handleDownload(material.id, material.filename)}
-                      className="p-2 text-green-600 hover:bg-green-100 rounded-lg transition-colors"
-                      title="Download"
-                    >
-                      <Download className="w-5 h-5" />
-                    </button>
+                    <div className="flex gap-2">
+                      <button
+                        onClick={() => handleReadMaterial(material)}
+                        className="p-2 text-green-600 hover:bg-green-100 rounded-lg transition-colors"
+                        title="Read"
+                      >
+                        <BookOpen className="w-5 h-5" />
+                      </button>
+                      <button
+                        onClick={() => handleDownload(material.id, material.filename)}
+                        className="p-2 text-green-600 hover:bg-green-100 rounded-lg transition-colors"
+                        title="Download"
+                      >
+                        <Download className="w-5 h-5" />
+                      </button>
+                    </div>
                   </div>
                 ))}
               </div>
             )}
           </div>
 
+          {readingMaterial && (
+            <div className="fixed inset-0 bg-black bg-opacity-50 flex items-center justify-center p-4 z-50">
+              <div className="bg-white rounded-lg p-6 max-w-3xl w-full max-h-[90vh] flex flex-col">
+                <div className="flex justify-between items-center mb-4">
+                  <h3 className="text-xl font-semibold">{readingMaterial.material.title}</h3>
+                  <button
+                    onClick={() => setReadingMaterial(null)}
+                    className="p-2 text-gray-600 hover:bg-gray-100 rounded-lg"
+                    title="Close"
+                  >
+                    <XCircle className="w-5 h-5" />
+                  </button>
+                </div>
+                <div className="overflow-y-auto flex-1 space-y-6">
+                  {readingMaterial.pages.map((page) => (
+                    <div key={page.page}>
+                      <p className="text-xs font-semibold text-gray-500 mb-2">Page {page.page} of {readingMaterial.totalPages}</p>
+                      <p className="text-gray-800 whitespace-pre-wrap">{page.text || 'No text on this page.'}</p>
+                    </div>
+                  ))}
+                </div>
+                <div className="flex justify-between mt-4">
+                  <button
+                    onClick={() => handleReadMaterial(readingMaterial.material, Math.max(1, readingMaterial.start - READER_PAGE_COUNT))}
+                    disabled={readingMaterial.start <= 1}
+                    className="bg-gray-200 text-gray-700 px-4 py-2 rounded-lg hover:bg-gray-300 disabled:opacity-50 disabled:cursor-not-allowed"
+                  >
+                    Previous
+                  </button>
+                  <button
+                    onClick={() => handleReadMaterial(readingMaterial.material, readingMaterial.start + READER_PAGE_COUNT)}
+                    disabled={readingMaterial.start + READER_PAGE_COUNT > readingMaterial.totalPages}
+                    className="bg-green-600 text-white px-4 py-2 rounded-lg hover:bg-green-700 disabled:bg-gray-400 disabled:cursor-not-allowed"
+                  >
+                    Next
+                  </button>
+                </div>
+              </div>
+            </div>
+          )}
+
           <div className="bg-white rounded-lg shadow-md p-6 mb-6">
             <div className="mb-4">
               <label className="block text-sm font-medium text-gray-700 mb-2">Enter Your Name</label>